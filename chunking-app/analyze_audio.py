@@ -1,132 +1,269 @@
 #!/usr/bin/env python3
 """
 Analyze Vipassana audio files to detect chanting vs silence segments.
-Generates visualization and identifies segment boundaries.
+Identifies segment boundaries and optionally generates visualization
+(--visualize).
 """
 
-import librosa
-import librosa.display
+import matplotlib
+matplotlib.use("Agg")  # Headless backend, no GUI state in worker processes
+
 import matplotlib.pyplot as plt
 import numpy as np
+import argparse
+import os
+import soundfile as sf
+from scipy.signal import resample_poly
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from pathlib import Path
-import json
-
-
-def analyze_audio(file_path: str, output_dir: str = "analysis"):
-    """Analyze a single audio file and generate visualization."""
+from collections.abc import Iterable, Iterator
+import orjson
+
+# Only a 1 Hz RMS envelope is needed for silence detection, so keep the
+# signal at a low rate to cut memory and analysis time
+ANALYSIS_SR = 8000
+
+# Decode and resample this many seconds at a time, so only one block of the
+# native-rate signal is in memory instead of the whole decoded file
+DECODE_BLOCK_SECONDS = 60
+
+# Segment values are NumPy floats, which orjson only writes with this flag
+JSON_OPTIONS = orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY
+
+# Palette for the segment plot (Set2's 8 distinct colors, cycled so
+# neighbouring segments never share a color)
+_SET2_COLORS = plt.cm.Set2.colors
+
+
+def _audioread_blocks(f, blocksize: int) -> Iterator[np.ndarray]:
+    """Regroup audioread's int16 buffers into float32 (frames, channels) blocks."""
+    block_len = blocksize * f.channels
+    pending: list[np.ndarray] = []
+    n_pending = 0
+    for buf in f:
+        pending.append(np.frombuffer(buf, dtype="<i2"))
+        n_pending += len(pending[-1])
+        if n_pending < block_len:
+            continue
+        pcm = np.concatenate(pending)
+        n_full = len(pcm) - len(pcm) % block_len
+        for i in range(0, n_full, block_len):
+            yield pcm[i:i + block_len].astype(np.float32).reshape(-1, f.channels) / 32768.0
+        pending = [pcm[n_full:]]
+        n_pending = len(pending[0])
+    if n_pending:
+        yield np.concatenate(pending).astype(np.float32).reshape(-1, f.channels) / 32768.0
+
+
+def _downmix_resample(blocks: Iterable[np.ndarray], sr_native: int, sr: int) -> np.ndarray:
+    """Downmix (frames, channels) blocks to mono and resample each to sr."""
+    out = []
+    for block in blocks:
+        y = block.mean(axis=1, dtype=np.float32) if block.shape[1] > 1 else block[:, 0]
+        if sr_native != sr:
+            y = resample_poly(y, sr, sr_native).astype(np.float32)
+        out.append(y)
+    return np.concatenate(out) if out else np.empty(0, dtype=np.float32)
+
+
+def load_audio(file_path: str, sr: int = ANALYSIS_SR) -> tuple[np.ndarray, int]:
+    """
+    Decode an audio file to mono float32 at sr.
+
+    Decoding, downmixing and resampling go block by block, so peak memory is
+    one native-rate block plus the low-rate result. Block seams only touch a
+    few samples each, which the 1 Hz RMS envelope doesn't notice.
+    """
+    try:
+        sr_native = sf.info(file_path).samplerate
+    except sf.LibsndfileError:
+        # Formats libsndfile can't handle (e.g. m4a)
+        import audioread  # only needed for the fallback path
+
+        with audioread.audio_open(file_path) as f:
+            blocks = _audioread_blocks(f, f.samplerate * DECODE_BLOCK_SECONDS)
+            return _downmix_resample(blocks, f.samplerate, sr), sr
+
+    blocks = sf.blocks(
+        file_path,
+        blocksize=sr_native * DECODE_BLOCK_SECONDS,
+        dtype="float32",
+        always_2d=True
+    )
+    return _downmix_resample(blocks, sr_native, sr), sr
+
+
+def load_audio_cached(file_path: str, cache_path: Path, sr: int = ANALYSIS_SR) -> tuple[np.ndarray, int]:
+    """
+    Load decoded mono PCM from cache_path if it was made from the current
+    source, otherwise decode the source and write the cache.
+
+    The cache is a 16-bit FLAC at the analysis rate, so re-running the
+    analysis (e.g. while tuning thresholds) skips the MP3 decode + resample.
+    The source's size and mtime are stored in the FLAC's comment and must
+    match exactly, so a replaced source is decoded again even if its mtime
+    is older than the cache.
+    """
+    stat = Path(file_path).stat()
+    source_stamp = f"{stat.st_size}:{stat.st_mtime_ns}"
+
+    if cache_path.exists():
+        with sf.SoundFile(cache_path) as f:
+            if f.comment == source_stamp and f.samplerate == sr:
+                return f.read(dtype="float32"), sr
+
+    y, sr = load_audio(file_path, sr=sr)
+
+    # Write under a temporary name and rename, so an interrupted run never
+    # leaves a truncated cache behind
+    tmp_path = cache_path.with_name(cache_path.name + ".part")
+    with sf.SoundFile(tmp_path, "w", sr, 1, subtype="PCM_16", format="FLAC") as f:
+        f.comment = source_stamp
+        f.write(y)
+    os.replace(tmp_path, cache_path)
+    return y, sr
+
+
+def analyze_audio(file_path: str, output_dir: str = "analysis", visualize: bool = True) -> tuple[list[str], dict]:
+    """
+    Analyze a single audio file and optionally generate visualization.
+
+    Runs in parallel with other files, so log lines are collected and
+    returned with the result instead of printed to keep each file's output
+    together.
+    """
+    log: list[str] = []
 
     output_path = Path(output_dir)
     output_path.mkdir(exist_ok=True)
 
     file_name = Path(file_path).stem
-    print(f"\nAnalyzing: {file_name}")
+    log.append(f"\nAnalyzing: {file_name}")
 
-    # Load audio (sr=None preserves original sample rate)
-    print("  Loading audio...")
-    y, sr = librosa.load(file_path, sr=22050)  # Downsample for faster processing
-    duration = librosa.get_duration(y=y, sr=sr)
-    print(f"  Duration: {duration/60:.1f} minutes ({duration:.0f} seconds)")
+    # Load audio
+    log.append("  Loading audio...")
+    sr = ANALYSIS_SR
+    y, sr = load_audio_cached(file_path, output_path / f"{file_name}_{sr}hz.flac", sr=sr)
+    y = y.astype(np.float32, copy=False)  # Keep the signal and envelope in float32
+    duration = len(y) / sr
+    log.append(f"  Duration: {duration/60:.1f} minutes ({duration:.0f} seconds)")
 
     # Calculate RMS energy over time (1-second windows)
-    print("  Calculating energy levels...")
+    log.append("  Calculating energy levels...")
     hop_length = sr  # 1 second windows
     frame_length = sr * 2  # 2 second frames with overlap
 
-    rms = librosa.feature.rms(y=y, frame_length=frame_length, hop_length=hop_length)[0]
-    times = librosa.times_like(rms, sr=sr, hop_length=hop_length)
-
-    # Normalize RMS
-    rms_normalized = rms / np.max(rms) if np.max(rms) > 0 else rms
-
-    # Detect segments using threshold
+    # Windowed sums from one running sum of y^2. Frames are centered like
+    # librosa.feature.rms: y is zero-padded by half a frame on each side,
+    # so frame i is labeled with time i * hop_length / sr.
+    # Only the running sum is float64, so its error doesn't grow over long
+    # files; the squared signal and the envelope stay float32.
+    y2 = np.square(np.pad(y, frame_length // 2), dtype=np.float32)
+    csum = np.empty(len(y2) + 1, dtype=np.float64)
+    csum[0] = 0
+    np.cumsum(y2, dtype=np.float64, out=csum[1:])
+
+    frame_starts = np.arange(0, len(y2) - frame_length + 1, hop_length)
+    energy = (csum[frame_starts + frame_length] - csum[frame_starts]) / frame_length
+    rms = np.sqrt(energy.astype(np.float32))
+    times = frame_starts / sr
+
+    # Detect segments using threshold (relative to the peak RMS, compared
+    # against the raw envelope so it never needs normalizing)
     threshold = 0.05  # Silence threshold (adjustable)
-    is_active = rms_normalized > threshold
-
-    # Find segment boundaries
-    segments = []
-    in_segment = False
-    segment_start = 0
-
-    for i, active in enumerate(is_active):
-        if active and not in_segment:
-            segment_start = times[i]
-            in_segment = True
-        elif not active and in_segment:
-            segment_end = times[i]
-            if segment_end - segment_start > 3:  # Ignore segments < 3 seconds
-                segments.append({
-                    "start": float(segment_start),
-                    "end": float(segment_end),
-                    "duration": float(segment_end - segment_start)
-                })
-            in_segment = False
-
-    # Handle final segment
-    if in_segment:
-        segments.append({
-            "start": float(segment_start),
-            "end": float(duration),
-            "duration": float(duration - segment_start)
-        })
-
-    # Merge nearby segments (gaps < 2 seconds)
-    merged_segments = []
-    for seg in segments:
-        if merged_segments and seg["start"] - merged_segments[-1]["end"] < 2:
-            merged_segments[-1]["end"] = seg["end"]
-            merged_segments[-1]["duration"] = merged_segments[-1]["end"] - merged_segments[-1]["start"]
-        else:
-            merged_segments.append(seg)
-
-    print(f"  Found {len(merged_segments)} distinct segments")
-
-    # Create visualization
-    fig, axes = plt.subplots(3, 1, figsize=(16, 10))
-
-    # Plot 1: Waveform
-    ax1 = axes[0]
-    librosa.display.waveshow(y, sr=sr, ax=ax1, alpha=0.6)
-    ax1.set_title(f"Waveform: {file_name}")
-    ax1.set_xlabel("")
-
-    # Plot 2: RMS Energy over time
-    ax2 = axes[1]
-    ax2.plot(times, rms_normalized, color='blue', linewidth=0.8)
-    ax2.axhline(y=threshold, color='red', linestyle='--', label=f'Threshold ({threshold})')
-    ax2.fill_between(times, 0, rms_normalized, alpha=0.3)
-    ax2.set_title("Energy Level Over Time")
-    ax2.set_xlabel("Time (seconds)")
-    ax2.set_ylabel("Normalized RMS")
-    ax2.legend()
-
-    # Plot 3: Detected segments
-    ax3 = axes[2]
-    ax3.set_xlim(0, duration)
-    ax3.set_ylim(0, 1)
-
-    colors = plt.cm.Set2(np.linspace(0, 1, len(merged_segments)))
-    for i, seg in enumerate(merged_segments):
-        ax3.axvspan(seg["start"], seg["end"], alpha=0.5, color=colors[i])
-        mid = (seg["start"] + seg["end"]) / 2
-        ax3.text(mid, 0.5, f'{i+1}\n{seg["duration"]/60:.1f}m',
-                ha='center', va='center', fontsize=8)
-
-    ax3.set_title(f"Detected Segments ({len(merged_segments)} total)")
-    ax3.set_xlabel("Time (seconds)")
-    ax3.set_yticks([])
-
-    # Add time markers every 5 minutes
-    for t in range(0, int(duration), 300):
-        ax3.axvline(x=t, color='gray', linestyle=':', alpha=0.5)
-        ax3.text(t, 1.02, f'{t//60}m', ha='center', fontsize=8)
-
-    plt.tight_layout()
-
-    # Save visualization
-    viz_path = output_path / f"{file_name}_analysis.png"
-    plt.savefig(viz_path, dpi=150)
-    plt.close()
-    print(f"  Saved visualization: {viz_path}")
+    peak = rms.max() if len(rms) else 0.0
+    is_active = rms > threshold * peak
+
+    # Find segment boundaries from the rising/falling edges of the mask
+    edges = np.diff(np.concatenate(([0], is_active.astype(np.int8), [0])))
+    starts_idx = np.flatnonzero(edges == 1)
+    ends_idx = np.flatnonzero(edges == -1)
+
+    # A segment still active at the last frame runs to the end of the file
+    open_ended = ends_idx == len(times)
+    starts_t = times[starts_idx]
+    ends_t = np.where(open_ended, duration, times[np.minimum(ends_idx, len(times) - 1)])
+
+    # Ignore segments < 3 seconds (the final segment is always kept)
+    keep = (ends_t - starts_t > 3) | open_ended
+    starts_t = starts_t[keep]
+    ends_t = ends_t[keep]
+
+    # Merge nearby segments (gaps < 2 seconds): a new group begins wherever
+    # the gap to the previous segment is >= 2 seconds
+    gaps = starts_t[1:] - ends_t[:-1]
+    group_starts = np.flatnonzero(np.concatenate(([True], gaps >= 2))[:len(starts_t)])
+    merged_starts = starts_t[group_starts]
+    merged_ends = np.maximum.reduceat(ends_t, group_starts)
+
+    merged_segments = [
+        {"start": start, "end": end, "duration": end - start}
+        for start, end in zip(merged_starts, merged_ends)
+    ]
+
+    log.append(f"  Found {len(merged_segments)} distinct segments")
+
+    # Create visualization (slow, only needed for manual inspection)
+    if visualize:
+        fig, axes = plt.subplots(3, 1, figsize=(16, 10))
+
+        # Plot 1: Waveform
+        ax1 = axes[0]
+        # Min/max envelope over ~4000 bins instead of drawing every sample
+        n_bins = min(4000, len(y))
+        bin_starts = np.linspace(0, len(y), n_bins, endpoint=False).astype(np.intp)
+        env_min = np.minimum.reduceat(y, bin_starts)
+        env_max = np.maximum.reduceat(y, bin_starts)
+        ax1.fill_between(bin_starts / sr, env_min, env_max, alpha=0.6, rasterized=True)
+        ax1.set_xlim(0, duration)
+        ax1.set_title(f"Waveform: {file_name}")
+        ax1.set_xlabel("")
+
+        # Plot 2: RMS Energy over time
+        rms_normalized = rms * (1.0 / peak) if peak > 0 else rms
+        ax2 = axes[1]
+        ax2.plot(times, rms_normalized, color='blue', linewidth=0.8)
+        ax2.axhline(y=threshold, color='red', linestyle='--', label=f'Threshold ({threshold})')
+        ax2.fill_between(times, 0, rms_normalized, alpha=0.3)
+        ax2.set_title("Energy Level Over Time")
+        ax2.set_xlabel("Time (seconds)")
+        ax2.set_ylabel("Normalized RMS")
+        ax2.legend()
+
+        # Plot 3: Detected segments
+        ax3 = axes[2]
+        ax3.set_xlim(0, duration)
+        ax3.set_ylim(0, 1)
+
+        # One artist for all segment spans instead of an axvspan per segment
+        ax3.broken_barh(
+            [(seg["start"], seg["duration"]) for seg in merged_segments],
+            (0, 1),
+            facecolors=_SET2_COLORS,
+            alpha=0.5
+        )
+        for i, seg in enumerate(merged_segments):
+            mid = (seg["start"] + seg["end"]) / 2
+            ax3.text(mid, 0.5, f'{i+1}\n{seg["duration"]/60:.1f}m',
+                    ha='center', va='center', fontsize=8)
+
+        ax3.set_title(f"Detected Segments ({len(merged_segments)} total)")
+        ax3.set_xlabel("Time (seconds)")
+        ax3.set_yticks([])
+
+        # Add time markers every 5 minutes
+        for t in range(0, int(duration), 300):
+            ax3.axvline(x=t, color='gray', linestyle=':', alpha=0.5)
+            ax3.text(t, 1.02, f'{t//60}m', ha='center', fontsize=8)
+
+        plt.tight_layout()
+
+        # Save visualization
+        viz_path = output_path / f"{file_name}_analysis.png"
+        plt.savefig(viz_path, dpi=100, pil_kwargs={"optimize": True})
+        plt.close()
+        log.append(f"  Saved visualization: {viz_path}")
 
     # Save segment data
     result = {
@@ -137,24 +274,28 @@ def analyze_audio(file_path: str, output_dir: str = "analysis"):
     }
 
     json_path = output_path / f"{file_name}_segments.json"
-    with open(json_path, 'w') as f:
-        json.dump(result, f, indent=2)
-    print(f"  Saved segment data: {json_path}")
+    json_path.write_bytes(orjson.dumps(result, option=JSON_OPTIONS))
+    log.append(f"  Saved segment data: {json_path}")
 
     # Print segment summary
-    print("\n  Segment Summary:")
+    log.append("\n  Segment Summary:")
     for i, seg in enumerate(merged_segments):
         start_m = int(seg["start"] // 60)
         start_s = int(seg["start"] % 60)
         end_m = int(seg["end"] // 60)
         end_s = int(seg["end"] % 60)
         dur_m = seg["duration"] / 60
-        print(f"    {i+1}. {start_m:02d}:{start_s:02d} - {end_m:02d}:{end_s:02d} ({dur_m:.1f} min)")
+        log.append(f"    {i+1}. {start_m:02d}:{start_s:02d} - {end_m:02d}:{end_s:02d} ({dur_m:.1f} min)")
 
-    return result
+    return log, result
 
 
 def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--visualize", action="store_true",
+                        help="Render waveform/energy/segment plots for each file")
+    args = parser.parse_args()
+
     sample_dir = Path("sample")
 
     if not sample_dir.exists():
@@ -169,18 +310,21 @@ def main():
 
     print(f"Found {len(audio_files)} audio file(s)")
 
-    all_results = []
-    for audio_file in audio_files:
-        result = analyze_audio(str(audio_file))
-        all_results.append(result)
+    # Files are independent, analyze them in parallel
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        analyze = partial(analyze_audio, visualize=args.visualize)
+        all_results = []
+        for log, result in executor.map(analyze, map(str, audio_files)):
+            print("\n".join(log))
+            all_results.append(result)
 
     # Save combined results
-    with open("analysis/all_segments.json", 'w') as f:
-        json.dump(all_results, f, indent=2)
+    Path("analysis/all_segments.json").write_bytes(orjson.dumps(all_results, option=JSON_OPTIONS))
 
     print("\n" + "="*50)
     print("Analysis complete! Check the 'analysis/' folder for:")
-    print("  - Visual waveforms and energy plots (*_analysis.png)")
+    if args.visualize:
+        print("  - Visual waveforms and energy plots (*_analysis.png)")
     print("  - Segment data in JSON format (*_segments.json)")
 
 
@@ -8,13 +8,20 @@ Uses BEST_FIT_SAFE algorithm:
 - Extracts multiple non-overlapping chunks per duration
 """
 
-import json
-import subprocess
-import shutil
+import argparse
+import asyncio
+import os
+import pickle
+import shlex
 import re
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from dataclasses import dataclass
 
+import numpy as np
+import orjson
+
 
 @dataclass
 class ChunkConfig:
@@ -45,42 +52,120 @@ EXTRACT_CONFIG = {
     "exclude_filters": ["Dohas"],
 }
 
+# File name patterns used by extract_day_number
+_DAY_RE = re.compile(r'Day(\d+)', re.IGNORECASE)
+_YEAR_RE = re.compile(r'_(\d{4})')
+_PAREN_RE = re.compile(r'\((\d+)\)')
+
+
+def is_up_to_date(path: Path, sources: list[Path]) -> bool:
+    """Check that path exists and is at least as new as every source."""
+    if not path.exists():
+        return False
+    mtime = path.stat().st_mtime
+    return all(p.stat().st_mtime <= mtime for p in sources)
+
+
+def parse_segment_jsons(analysis_dir: Path, json_files: list[Path], file_keys: set[str]) -> dict:
+    """
+    Parse segment data for json_files.
+
+    Prefers the combined all_segments.json written by analyze_audio.py when
+    it is newer than, and covers exactly, the per-file JSONs, so a single
+    file is parsed instead of one per source. Otherwise the per-file JSONs
+    are read in parallel.
+    """
+    index_file = analysis_dir / "all_segments.json"
+    if is_up_to_date(index_file, json_files):
+        segments_by_file = {
+            data["file"]: data for data in orjson.loads(index_file.read_bytes())
+        }
+        if segments_by_file.keys() == file_keys:
+            return segments_by_file
+
+    # Reads release the GIL, so overlap their latency across files
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        parsed = executor.map(lambda p: orjson.loads(p.read_bytes()), json_files)
+        return {data["file"]: data for data in parsed}
+
 
 def load_segments(analysis_dir: Path) -> dict:
-    """Load all segment data from analysis JSON files."""
-    segments_by_file = {}
+    """
+    Load all segment data from analysis JSON files.
 
-    for json_file in analysis_dir.glob("*_segments.json"):
-        if json_file.name == "all_segments.json":
-            continue
-        with open(json_file) as f:
-            data = json.load(f)
-            segments_by_file[data["file"]] = data
+    Each file's data also gets its segment_arrays() under "arrays". The
+    result is pickled to _segments.cache.pkl, and later runs load that
+    directly while it is still newer than, and covers exactly, the JSONs.
+    """
+    json_files = [
+        p for p in analysis_dir.glob("*_segments.json")
+        if p.name != "all_segments.json"
+    ]
+    if not json_files:
+        return {}
+    file_keys = {p.name.removesuffix("_segments.json") for p in json_files}
+
+    cache_file = analysis_dir / "_segments.cache.pkl"
+    if is_up_to_date(cache_file, json_files):
+        try:
+            with open(cache_file, "rb") as f:
+                segments_by_file = pickle.load(f)
+        except (EOFError, pickle.UnpicklingError):
+            segments_by_file = {}  # Unreadable cache, rebuild it below
+        if segments_by_file.keys() == file_keys:
+            return segments_by_file
+
+    segments_by_file = parse_segment_jsons(analysis_dir, json_files, file_keys)
+    for data in segments_by_file.values():
+        data["arrays"] = segment_arrays(data["segments"])
+
+    # Write under a temporary name and rename, so an interrupted run never
+    # leaves a truncated cache behind
+    tmp_file = cache_file.with_name(cache_file.name + ".part")
+    with open(tmp_file, "wb") as f:
+        pickle.dump(segments_by_file, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_file, cache_file)
 
     return segments_by_file
 
 
-def find_multiple_chunks_safe(
-    segments: list[dict],
-    target: int,
-    min_dur: int,
-    max_dur: int,
+def segment_arrays(segments: list[dict]) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Build (starts, ends, cum) arrays for a file's segments.
+
+    cum[j] - cum[i] is the total duration of segments[i:j]. Computed once per
+    file and shared by every chunk duration.
+    """
+    starts = np.fromiter((seg["start"] for seg in segments), dtype=np.float64, count=len(segments))
+    ends = np.fromiter((seg["end"] for seg in segments), dtype=np.float64, count=len(segments))
+    durations = np.fromiter((seg["duration"] for seg in segments), dtype=np.float64, count=len(segments))
+    cum = np.concatenate(([0.0], np.cumsum(durations)))
+    return starts, ends, cum
+
+
+def find_chunks_for_configs(
+    arrays: tuple[np.ndarray, np.ndarray, np.ndarray],
+    configs: list[ChunkConfig],
     exclude_last_seconds: int = 300,
     max_chunks: int = 10
-) -> list[ExtractedChunk]:
+) -> dict[str, list[ExtractedChunk]]:
     """
-    Find multiple non-overlapping chunks using BEST_FIT_SAFE algorithm.
+    Find multiple non-overlapping chunks per config using BEST_FIT_SAFE algorithm.
 
-    - Finds all possible chunks that fit the target duration
+    - Finds all possible chunks that fit each config's duration range
     - Excludes any chunk that STARTS in the last N seconds (avoids closing mantras)
     - Sorts by closest to target duration
     - Greedily selects non-overlapping chunks
-    - Returns sorted by start time
+    - Returns each config's chunks sorted by start time
+
+    `arrays` is the (starts, ends, cum) tuple from segment_arrays(), shared
+    by every config.
     """
-    if not segments:
-        return []
+    starts, ends, cum = arrays
+    if len(starts) == 0:
+        return {config.name: [] for config in configs}
 
-    total_duration = segments[-1]["end"]
+    total_duration = ends[-1]
     cutoff_time = total_duration - exclude_last_seconds
 
     # If file is too short, adjust cutoff (use at least 50% of file)
@@ -88,54 +173,131 @@ def find_multiple_chunks_safe(
     if cutoff_time < min_cutoff:
         cutoff_time = min_cutoff
 
-    # Find all possible chunks
-    all_possible: list[ExtractedChunk] = []
+    # Don't start a chunk past the cutoff
+    n_starts = int(np.searchsorted(starts, cutoff_time, side="left"))
+
+    # Sweep every config's duration range in one call
+    bounds = config_array(configs)
+    first_ends, last_ends = _window_bounds(cum, n_starts, bounds["min"], bounds["max"])
+
+    names = [config.name for config in configs]
+    return {
+        name: select_chunks(
+            starts,
+            ends,
+            *expand_windows(cum, first_ends[i], last_ends[i]),
+            target,
+            max_chunks
+        )
+        for i, (name, target) in enumerate(zip(names, bounds["target"].tolist()))
+    }
+
 
-    for start_idx in range(len(segments)):
-        # Don't start a chunk past the cutoff
-        if segments[start_idx]["start"] >= cutoff_time:
-            break
+def config_array(configs: list[ChunkConfig]) -> np.ndarray:
+    """Pack configs' (target, min, max) seconds into a structured array."""
+    return np.array(
+        [(c.target_seconds, c.min_seconds, c.max_seconds) for c in configs],
+        dtype=[("target", np.float64), ("min", np.float64), ("max", np.float64)]
+    )
 
-        cumulative_duration = 0
 
-        for end_idx in range(start_idx, len(segments)):
-            seg = segments[end_idx]
-            cumulative_duration += seg["duration"]
+def expand_windows(
+    cum: np.ndarray,
+    first_ends: np.ndarray,
+    last_ends: np.ndarray
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Expand each start's [first_end, last_end] range from _window_bounds()
+    into flat (start_idx, end_idx, durations), ordered by start then end.
+    """
+    counts = np.maximum(last_ends - first_ends + 1, 0)
+    start_idx = np.repeat(np.arange(len(counts)), counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    end_idx = first_ends[start_idx] + offsets
+    durations = cum[end_idx + 1] - cum[start_idx]
 
-            if min_dur <= cumulative_duration <= max_dur:
-                diff = abs(cumulative_duration - target)
-                all_possible.append(ExtractedChunk(
-                    start=segments[start_idx]["start"],
-                    end=segments[end_idx]["end"],
-                    duration=cumulative_duration,
-                    diff=diff
-                ))
+    return start_idx, end_idx, durations
 
-            if cumulative_duration > max_dur:
-                break
 
-    # Sort by how close to target (best first)
-    all_possible.sort(key=lambda x: x.diff)
+def _window_bounds(
+    cum: np.ndarray,
+    n_starts: int,
+    min_durs: np.ndarray,
+    max_durs: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    For each config c and start < n_starts, the first and last end index
+    whose window duration is within [min_durs[c], max_durs[c]] (empty when
+    first > last). Both are returned as (n_configs, n_starts) arrays.
+    """
+    sums = cum.tolist()
+    n_segments = len(sums) - 1
+    first_ends = np.empty((len(min_durs), n_starts), dtype=np.intp)
+    last_ends = np.empty((len(min_durs), n_starts), dtype=np.intp)
+
+    # Windows only get shorter as the start moves right, so the first end
+    # reaching min_dur and the first end past max_dur both only move
+    # forward: a single two-pointer sweep covers every start
+    for c, (min_dur, max_dur) in enumerate(zip(min_durs.tolist(), max_durs.tolist())):
+        lo = hi = 0
+        for start in range(n_starts):
+            lo = max(lo, start)
+            while lo < n_segments and sums[lo + 1] - sums[start] < min_dur:
+                lo += 1
+            hi = max(hi, start)
+            while hi < n_segments and sums[hi + 1] - sums[start] <= max_dur:
+                hi += 1
+            first_ends[c, start] = lo
+            last_ends[c, start] = hi - 1
+
+    return first_ends, last_ends
+
+
+def select_chunks(
+    starts: np.ndarray,
+    ends: np.ndarray,
+    start_idx: np.ndarray,
+    end_idx: np.ndarray,
+    durations: np.ndarray,
+    target: float,
+    max_chunks: int
+) -> list[ExtractedChunk]:
+    """
+    Greedily pick up to max_chunks non-overlapping chunks from the candidate
+    windows, closest to target first. Returns sorted by start time.
+    """
+    # Candidates are ordered by start then end, and the stable sort keeps
+    # that order among equally good chunks
+    diffs = np.abs(durations - target)
+    order = np.argsort(diffs, kind="stable")
 
-    # Greedily select non-overlapping chunks
+    # Greedily select non-overlapping chunks. Selected ranges are kept
+    # sorted by start; since they never overlap, their ends are sorted too.
     selected: list[ExtractedChunk] = []
-    used_ranges: list[tuple[float, float]] = []
-
-    for chunk in all_possible:
+    used_starts: list[float] = []
+    used_ends: list[float] = []
+
+    # Walk candidates best first, building an ExtractedChunk only for the
+    # ones selected: the walk usually stops at max_chunks long before the end
+    for start, end, duration, diff in zip(
+        starts[start_idx[order]].tolist(),
+        ends[end_idx[order]].tolist(),
+        durations[order].tolist(),
+        diffs[order].tolist()
+    ):
         if len(selected) >= max_chunks:
             break
 
-        # Check if this chunk overlaps with any selected chunk
-        overlaps = False
-        for used_start, used_end in used_ranges:
-            # Overlap if NOT (chunk ends before used starts OR chunk starts after used ends)
-            if not (chunk.end <= used_start or chunk.start >= used_end):
-                overlaps = True
-                break
+        # Only the neighbours on either side of the insertion point can overlap
+        i = bisect_right(used_starts, start)
+        if i > 0 and used_ends[i - 1] > start:
+            continue
+        if i < len(used_starts) and used_starts[i] < end:
+            continue
 
-        if not overlaps:
-            selected.append(chunk)
-            used_ranges.append((chunk.start, chunk.end))
+        selected.append(ExtractedChunk(start=start, end=end, duration=duration, diff=diff))
+        used_starts.insert(i, start)
+        used_ends.insert(i, end)
 
     # Sort by start time for consistent ordering
     selected.sort(key=lambda x: x.start)
@@ -143,28 +305,153 @@ def find_multiple_chunks_safe(
     return selected
 
 
-def extract_audio_chunk(
+def part_path(output_file: Path) -> Path:
+    """Temporary name an output is written under until ffmpeg succeeds."""
+    return output_file.with_name(output_file.name + ".part")
+
+
+def build_ffmpeg_cmd(
     input_file: Path,
-    output_file: Path,
-    start_sec: float,
-    end_sec: float
-) -> bool:
-    """Extract a chunk from audio file using ffmpeg."""
-    duration = end_sec - start_sec
+    outputs: list[tuple[Path, float, float]],
+    copy: bool
+) -> list[str]:
+    """
+    Build one ffmpeg command writing every (output_file, start_sec, end_sec).
 
+    With `copy`, MP3 frames are copied as-is (no decode/encode); otherwise
+    each output is re-encoded with libmp3lame. Outputs are written to their
+    part_path(), and only renamed into place once the run succeeds.
+    """
     cmd = [
         "ffmpeg",
         "-y",
-        "-i", str(input_file),
-        "-ss", str(start_sec),
-        "-t", str(duration),
-        "-c:a", "libmp3lame",
-        "-q:a", "2",
-        str(output_file)
+        "-nostdin",
+        "-loglevel", "error",
+        "-nostats",
     ]
 
-    result = subprocess.run(cmd, capture_output=True, text=True)
-    return result.returncode == 0
+    # One input per chunk with -ss/-t before -i, so ffmpeg seeks straight to
+    # each chunk instead of reading the file from the start
+    for _, start_sec, end_sec in outputs:
+        cmd += [
+            "-ss", str(start_sec),
+            "-t", str(end_sec - start_sec),
+            "-i", str(input_file),
+        ]
+
+    if copy:
+        codec_args = ["-c:a", "copy", "-avoid_negative_ts", "make_zero"]
+    else:
+        codec_args = ["-c:a", "libmp3lame", "-q:a", "2"]
+
+    for input_idx, (output_file, _, _) in enumerate(outputs):
+        cmd += [
+            # Audio only, so embedded cover art isn't carried (or
+            # re-encoded) into every output
+            "-map", f"{input_idx}:a",
+            *codec_args,
+            "-f", "mp3",
+            str(part_path(output_file)),
+        ]
+
+    return cmd
+
+
+async def run_ffmpeg(
+    cmd: list[str],
+    semaphore: asyncio.Semaphore,
+    capture_errors: bool = False
+) -> tuple[bool, str]:
+    """
+    Run an ffmpeg command, waiting for a free slot first.
+
+    Returns whether it succeeded and, with capture_errors, ffmpeg's error
+    output. Otherwise stderr is discarded rather than piped and decoded.
+    """
+    async with semaphore:
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE if capture_errors else asyncio.subprocess.DEVNULL
+        )
+        _, stderr = await proc.communicate()
+    return proc.returncode == 0, stderr.decode(errors="replace").strip() if stderr else ""
+
+
+async def extract_audio_chunks(
+    input_file: Path,
+    outputs: list[tuple[Path, float, float]],
+    semaphore: asyncio.Semaphore
+) -> tuple[set[Path], str]:
+    """
+    Extract several chunks from one audio file with a single ffmpeg run.
+
+    `outputs` is a list of (output_file, start_sec, end_sec). All chunks
+    share one ffmpeg process instead of paying process startup once per
+    chunk, and each is read from its own input seeked to the chunk start.
+
+    MP3 sources are stream-copied (chunks are cut at silences, so frame
+    boundaries are fine) and only re-encoded if the copy fails. If the
+    shared run still fails, each chunk is retried in its own run, so one
+    bad chunk doesn't fail the others.
+
+    Outputs only appear under their final name once complete, so an
+    interrupted run can't leave a partial chunk for a later run to reuse.
+
+    Returns the output files that failed and ffmpeg's error output for them.
+    """
+    if input_file.suffix.lower() == ".mp3":
+        success, _ = await run_ffmpeg(build_ffmpeg_cmd(input_file, outputs, copy=True), semaphore)
+        if success:
+            for output_file, _, _ in outputs:
+                os.replace(part_path(output_file), output_file)
+            return set(), ""
+
+    # The last attempt keeps stderr to report why it failed; with
+    # -loglevel error that is only a few lines
+    cmd = build_ffmpeg_cmd(input_file, outputs, copy=False)
+    success, error = await run_ffmpeg(cmd, semaphore, capture_errors=True)
+    if success:
+        for output_file, _, _ in outputs:
+            os.replace(part_path(output_file), output_file)
+        return set(), ""
+    if len(outputs) == 1:
+        part_path(outputs[0][0]).unlink(missing_ok=True)
+        return {outputs[0][0]}, error
+
+    results = await asyncio.gather(*(
+        extract_audio_chunks(input_file, [output], semaphore) for output in outputs
+    ))
+    failed = set().union(*(failed for failed, _ in results))
+    errors = dict.fromkeys(error for _, error in results if error)
+    return failed, "\n".join(errors)
+
+
+def build_job_line(input_file: Path, outputs: list[tuple[Path, float, float]]) -> str:
+    """
+    Build a shell line extracting every output, for running outside Python.
+
+    Mirrors extract_audio_chunks(): MP3 sources are stream-copied and only
+    re-encoded if the copy fails, and outputs are renamed from their
+    part_path() only once a run succeeds. metadata.json already lists the
+    outputs, so a failed or killed job must never leave one under its
+    final name. If both attempts fail, the part files are removed and the
+    line still fails.
+    """
+    attempts = [build_ffmpeg_cmd(input_file, outputs, copy=False)]
+    if input_file.suffix.lower() == ".mp3":
+        attempts.insert(0, build_ffmpeg_cmd(input_file, outputs, copy=True))
+
+    renames = [
+        shlex.join(["mv", "-f", "--", str(part_path(output_file)), str(output_file)])
+        for output_file, _, _ in outputs
+    ]
+    cleanup = shlex.join(["rm", "-f", "--", *(str(part_path(output_file)) for output_file, _, _ in outputs)])
+    return (
+        " || ".join(map(shlex.join, attempts))
+        + " && " + " && ".join(renames)
+        + f" || {{ {cleanup}; false; }}"
+    )
 
 
 def extract_day_number(file_key: str) -> str:
@@ -179,7 +466,7 @@ def extract_day_number(file_key: str) -> str:
         "Special_Chantings_Chanting_Various" -> "sp00"
     """
     # Try to match "Day" followed by number
-    match = re.search(r'Day(\d+)', file_key, re.IGNORECASE)
+    match = _DAY_RE.search(file_key)
     if match:
         day_num = int(match.group(1))
         return f"day{day_num:02d}"
@@ -187,8 +474,8 @@ def extract_day_number(file_key: str) -> str:
     # Check for special chanting
     if "special" in file_key.lower():
         # Check for _1985 style suffix first (more specific)
-        year_match = re.search(r'_(\d{4})', file_key)
-        paren_match = re.search(r'\((\d+)\)', file_key)
+        year_match = _YEAR_RE.search(file_key)
+        paren_match = _PAREN_RE.search(file_key)
 
         if year_match and paren_match:
             # Both year and number: sp1985_01
@@ -209,21 +496,28 @@ def extract_day_number(file_key: str) -> str:
 
 def should_process_file(file_key: str, include_filters: list[str], exclude_filters: list[str]) -> bool:
     """Check if file should be processed based on filters."""
+    file_key_lower = file_key.lower()
+
     # Check exclusions first
     for exclude in exclude_filters:
-        if exclude.lower() in file_key.lower():
+        if exclude.lower() in file_key_lower:
             return False
 
     # Check inclusions
     for include in include_filters:
-        if include.lower() in file_key.lower():
+        if include.lower() in file_key_lower:
             return True
 
     return False
 
 
-def find_source_file(base_dir: Path, file_key: str) -> Path | None:
-    """Find source audio file in the directory structure."""
+def build_source_index(base_dir: Path) -> dict[str, Path]:
+    """
+    Map file key (stem) to source audio file in the directory structure.
+
+    Lists each source directory once instead of probing every extension
+    for every file. Earlier directories and extensions take precedence.
+    """
     # Define source directories to search
     source_dirs = [
         base_dir / "full-audio-chantings" / "10-days",
@@ -231,16 +525,32 @@ def find_source_file(base_dir: Path, file_key: str) -> Path | None:
         base_dir / "full-audio-chantings",
         base_dir / "sample",  # fallback
     ]
+    extensions = [".mp3", ".wav", ".m4a", ".webm"]
 
+    source_index: dict[str, Path] = {}
     for source_dir in source_dirs:
         if not source_dir.exists():
             continue
-        for ext in [".mp3", ".wav", ".m4a", ".webm"]:
-            candidate = source_dir / f"{file_key}{ext}"
-            if candidate.exists():
-                return candidate
-
-    return None
+        candidates = sorted(
+            (p for p in source_dir.iterdir() if p.suffix.lower() in extensions),
+            key=lambda p: extensions.index(p.suffix.lower())
+        )
+        for candidate in candidates:
+            source_index.setdefault(candidate.stem, candidate)
+
+    return source_index
+
+
+def load_previous_chunks(metadata_file: Path) -> dict[str, dict]:
+    """Map each chunk file listed in a previous run's metadata.json to its entry."""
+    if not metadata_file.exists():
+        return {}
+    metadata = orjson.loads(metadata_file.read_bytes())
+    return {
+        entry["file"]: entry
+        for entries in metadata.get("chanting", {}).values()
+        for entry in entries
+    }
 
 
 def get_duration(data: dict) -> float:
@@ -254,15 +564,144 @@ def get_duration(data: dict) -> float:
     return 0
 
 
-def extract_chunks():
-    """Main extraction function using BEST_FIT_SAFE algorithm."""
+async def process_file(
+    file_key: str,
+    data: dict,
+    source_index: dict[str, Path],
+    output_dir: Path,
+    previous: dict[str, dict],
+    semaphore: asyncio.Semaphore,
+    jobs: list[str] | None = None
+) -> tuple[list[str], dict[str, list]]:
+    """
+    Find and extract all chunks for a single source file.
+
+    Runs concurrently with other files, so log lines are collected and
+    returned instead of printed to keep output from different files together.
+
+    Chunks whose output already exists from a run with the same source and
+    boundaries (per `previous`, see load_previous_chunks()) and is newer
+    than the source file are reused instead of extracted again.
+
+    With `jobs`, the ffmpeg command line is appended there instead of run.
+    """
+    log: list[str] = []
+    metadata: dict[str, list] = {config.name: [] for config in CHUNK_CONFIGS}
+
+    duration = get_duration(data)
+    log.append(f"\n{'─' * 50}")
+    log.append(f"Processing: {file_key}")
+    log.append(f"  Total duration: {duration:.1f}s ({duration/60:.1f} min)")
+    log.append(f"  Segments: {len(data['segments'])}")
+
+    # Find source file
+    source_file = source_index.get(file_key)
+
+    if not source_file:
+        log.append(f"  ⚠ WARNING: Source file not found, skipping")
+        return log, metadata
+
+    arrays = data["arrays"]
+    day_id = extract_day_number(file_key)
+
+    # Plan chunks for every duration first, then extract them all in one go
+    planned = find_chunks_for_configs(
+        arrays,
+        CHUNK_CONFIGS,
+        exclude_last_seconds=EXTRACT_CONFIG["exclude_last_seconds"],
+        max_chunks=EXTRACT_CONFIG["max_chunks_per_duration"]
+    )
+
+    outputs: list[tuple[Path, float, float]] = []
+    reused: set[str] = set()
+    for name, chunks in planned.items():
+        for chunk_idx, chunk in enumerate(chunks, 1):
+            output_file = output_dir / f"{day_id}_{name}_c{chunk_idx}.mp3"
+            entry = previous.get(output_file.name)
+            if (
+                entry is not None
+                and entry["source"] == file_key
+                and entry["start"] == round(chunk.start, 2)
+                and entry["end"] == round(chunk.end, 2)
+                and is_up_to_date(output_file, [source_file])
+            ):
+                reused.add(output_file.name)
+            else:
+                outputs.append((output_file, chunk.start, chunk.end))
+
+    failed: set[Path] = set()
+    error = ""
+    if outputs and jobs is not None:
+        # Drop outdated outputs now, so a later run can't mistake them for
+        # the chunks planned here before the jobs have run
+        for output_file, _, _ in outputs:
+            output_file.unlink(missing_ok=True)
+        jobs.append(build_job_line(source_file, outputs))
+    elif outputs:
+        failed, error = await extract_audio_chunks(source_file, outputs, semaphore)
+
+    for config in CHUNK_CONFIGS:
+        chunks = planned[config.name]
+
+        if not chunks:
+            log.append(f"  {config.name}: No suitable chunks found")
+            continue
+
+        log.append(f"  {config.name}: Found {len(chunks)} chunks")
+
+        for chunk_idx, chunk in enumerate(chunks, 1):
+            output_name = f"{day_id}_{config.name}_c{chunk_idx}.mp3"
+
+            log.append(f"    c{chunk_idx}: {chunk.start:.1f}s - {chunk.end:.1f}s ({chunk.duration:.1f}s)")
+
+            if output_dir / output_name not in failed:
+                metadata[config.name].append({
+                    "file": output_name,
+                    "source": file_key,
+                    "start": round(chunk.start, 2),
+                    "end": round(chunk.end, 2),
+                    "duration": round(chunk.duration, 2)
+                })
+                log.append(f"       ✓ {output_name}" + (" (up to date)" if output_name in reused else ""))
+            else:
+                log.append(f"       ✗ Failed to create {output_name}")
+
+    if error:
+        log.append(f"  ffmpeg: {error}")
+
+    return log, metadata
+
+
+async def process_files(
+    files: dict[str, dict],
+    source_index: dict[str, Path],
+    output_dir: Path,
+    previous: dict[str, dict],
+    jobs: list[str] | None = None
+) -> list[tuple[list[str], dict[str, list]]]:
+    """Process all files concurrently, capping ffmpeg runs at the core count."""
+    semaphore = asyncio.Semaphore(os.cpu_count() or 1)
+    return await asyncio.gather(*(
+        process_file(file_key, files[file_key], source_index, output_dir, previous, semaphore, jobs)
+        for file_key in sorted(files)
+    ))
+
+
+def extract_chunks(jobs_file: Path | None = None):
+    """
+    Main extraction function using BEST_FIT_SAFE algorithm.
+
+    With `jobs_file`, chunks are only planned: the ffmpeg commands are
+    written there, one line per source file, for an external runner such as
+    GNU parallel, and metadata is written as if they had all succeeded.
+    """
     base_dir = Path(__file__).parent.parent
     analysis_dir = Path(__file__).parent / "analysis"
     output_dir = Path(__file__).parent / "chunks" / "chanting"
+    metadata_file = Path(__file__).parent / "chunks" / "metadata.json"
 
-    # Clean and recreate output directory
-    if output_dir.exists():
-        shutil.rmtree(output_dir)
+    # Keep existing chunks: unchanged ones are reused, the rest are
+    # overwritten or removed below
     output_dir.mkdir(parents=True, exist_ok=True)
 
     print("=" * 60)
@@ -293,62 +732,26 @@ def extract_chunks():
 
     total_chunks = {"2min": 0, "5min": 0, "10min": 0}
 
-    for file_key, data in sorted(filtered_files.items()):
-        duration = get_duration(data)
-        print(f"\n{'─' * 50}")
-        print(f"Processing: {file_key}")
-        print(f"  Total duration: {duration:.1f}s ({duration/60:.1f} min)")
-        print(f"  Segments: {len(data['segments'])}")
-
-        # Find source file
-        source_file = find_source_file(base_dir, file_key)
-
-        if not source_file:
-            print(f"  ⚠ WARNING: Source file not found, skipping")
-            continue
-
-        segments = data["segments"]
-        day_id = extract_day_number(file_key)
-
-        for config in CHUNK_CONFIGS:
-            chunks = find_multiple_chunks_safe(
-                segments,
-                config.target_seconds,
-                config.min_seconds,
-                config.max_seconds,
-                exclude_last_seconds=EXTRACT_CONFIG["exclude_last_seconds"],
-                max_chunks=EXTRACT_CONFIG["max_chunks_per_duration"]
-            )
-
-            if not chunks:
-                print(f"  {config.name}: No suitable chunks found")
-                continue
-
-            print(f"  {config.name}: Found {len(chunks)} chunks")
-
-            for chunk_idx, chunk in enumerate(chunks, 1):
-                output_name = f"{day_id}_{config.name}_c{chunk_idx}.mp3"
-                output_file = output_dir / output_name
-
-                print(f"    c{chunk_idx}: {chunk.start:.1f}s - {chunk.end:.1f}s ({chunk.duration:.1f}s)")
-
-                success = extract_audio_chunk(source_file, output_file, chunk.start, chunk.end)
-
-                if success:
-                    metadata[config.name].append({
-                        "file": output_name,
-                        "source": file_key,
-                        "start": round(chunk.start, 2),
-                        "end": round(chunk.end, 2),
-                        "duration": round(chunk.duration, 2)
-                    })
-                    total_chunks[config.name] += 1
-                    print(f"       ✓ {output_name}")
-                else:
-                    print(f"       ✗ Failed to create {output_name}")
+    source_index = build_source_index(base_dir)
+    jobs = [] if jobs_file else None
+    previous = load_previous_chunks(metadata_file)
+    results = asyncio.run(process_files(filtered_files, source_index, output_dir, previous, jobs))
+    for log, file_metadata in results:
+        print("\n".join(log))
+        for name, entries in file_metadata.items():
+            metadata[name].extend(entries)
+            total_chunks[name] += len(entries)
+
+    # Remove chunks from earlier runs that are no longer produced, and
+    # part files left by interrupted runs
+    current = {entry["file"] for entries in metadata.values() for entry in entries}
+    for old_file in output_dir.glob("*.mp3"):
+        if old_file.name not in current:
+            old_file.unlink()
+    for part_file in output_dir.glob("*.mp3.part"):
+        part_file.unlink()
 
     # Save metadata
-    metadata_file = Path(__file__).parent / "chunks" / "metadata.json"
 
     full_metadata = {
         "chanting": metadata,
@@ -356,8 +759,7 @@ def extract_chunks():
         "gong": "gong.mp3"
     }
 
-    with open(metadata_file, "w") as f:
-        json.dump(full_metadata, f, indent=2)
+    metadata_file.write_bytes(orjson.dumps(full_metadata, option=orjson.OPT_INDENT_2))
 
     print(f"\n{'=' * 60}")
     print("Extraction Complete!")
@@ -369,9 +771,19 @@ def extract_chunks():
     print(f"\nMetadata: {metadata_file}")
     print(f"Chunks:   {output_dir}")
 
+    if jobs_file:
+        jobs_file.write_text("".join(f"{job}\n" for job in jobs))
+        print(f"Jobs:     {jobs_file}")
+        print(f"\nRun with: parallel -j$(nproc) < {shlex.quote(str(jobs_file))}")
+
 
 def main():
-    extract_chunks()
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--jobs-file", type=Path,
+                        help="Write the ffmpeg commands here instead of running them")
+    args = parser.parse_args()
+
+    extract_chunks(jobs_file=args.jobs_file)
 
 
 if __name__ == "__main__":